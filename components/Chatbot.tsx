@@ -6,6 +6,8 @@ import React, { useState, useRef, useEffect } from 'react';
 import { ChatBubbleIcon, CloseIcon, PaperAirplaneIcon, SmartChefIcon } from './icons';
 // Gemini AI servisi ile iletişim kurmak için gerekli fonksiyonun içe aktarılması
 import { sendMessageToBot } from '../services/geminiService';
+// Sık sorulan soruları yerel olarak yanıtlayan önbellek dizininin ön yüklemesi
+import { preloadChatAnswerIndex } from '../services/chatCacheService';
 import Spinner from './Spinner';
 import {
   CHATBOT_INITIAL_MESSAGE,
@@ -58,6 +60,14 @@ const Chatbot: React.FC = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages]);
 
+  // Sohbet penceresi ilk açıldığında yerel yanıt önbelleği arka planda indirilmeye başlanır.
+  // Böylece ilk mesaj dizinin indirilmesini beklemez.
+  useEffect(() => {
+    if (isOpen) {
+      preloadChatAnswerIndex();
+    }
+  }, [isOpen]);
+
   // ---------------------------------------------------------------------------
   // OLAY İŞLEYİCİLERİ (EVENT HANDLERS)
   // ---------------------------------------------------------------------------
@@ -0,0 +1,201 @@
+// services/chatCacheService.ts
+// Bu modül, Chatbot için yerel yanıt önbelleğini yönetir.
+// tools/build_chat_answer_cache.py betiğinin ürettiği TF-IDF karakter n-gram dizinini yükler ve
+// kullanıcının sorusuna en yakın kaydı bulur. Benzerlik eşiği aşılırsa yanıt Gemini'ye gitmeden yerel olarak üretilir.
+// Dizin tarif ayrıntılarını içermez; malzemeler ve talimatlar gerektiğinde Firestore'daki tarif belgesinden okunur.
+
+import { getRecipeDocById } from './apiService';
+
+// Dizin dosyası Vite 'public' klasöründen sunulur.
+const CHAT_ANSWER_CACHE_URL = `${import.meta.env.BASE_URL}chat_answer_cache.json`;
+
+// Beklenen dosya biçimi sürümü (tools/build_chat_answer_cache.py içindeki INDEX_VERSION ile aynı olmalıdır).
+const CHAT_ANSWER_INDEX_VERSION = 4;
+
+type RecipeIntent = 'time' | 'ingredients' | 'instructions';
+
+// build_chat_answer_cache.py tarafından üretilen dosyanın yapısı.
+interface ChatAnswerIndex {
+  version: number;
+  ngramSize: number;
+  thresholds: { recipe: number; curated: number }; // Tarif adı ve küratörlü soru benzerlik eşikleri
+  unknownIdf: number;
+  intentPatterns: [string, RecipeIntent][]; // Normalleştirilmiş soru türü kalıpları (uzundan kısaya)
+  fillerWords: string[]; // Tarif adıyla karşılaştırmadan önce atılan dolgu kelimeleri
+  recipes: [number, string, number][]; // [tarif kimliği, ad, süre (dk)]
+  answers: string[]; // Küratörlü sorulara ait yanıtlar
+  answerKeywords: string[][][]; // Yanıt başına anahtar ifade grupları; her gruptan en az biri soruda geçmelidir
+  entries: [number, number][]; // Tarif adı için [tarif indeksi, -1], küratörlü soru için [-1, yanıt indeksi]
+  norms: number[]; // Her kaydın TF-IDF vektör normu
+  vocabulary: Record<string, [number, number[]]>; // n-gram -> [IDF, fark kodlu kayıt listesi]
+}
+
+let indexPromise: Promise<ChatAnswerIndex | null> | null = null;
+let loadedIndex: ChatAnswerIndex | null = null;
+
+/**
+ * preloadChatAnswerIndex - Dizini arka planda bir kez indirir.
+ * Chatbot açıldığında çağrılır; böylece ilk mesaj dizinin indirilmesini beklemez.
+ * Dosya bulunamazsa veya sürümü uyuşmazsa önbellek devre dışı kalır ve tüm mesajlar Gemini'ye gönderilir.
+ */
+export const preloadChatAnswerIndex = (): Promise<ChatAnswerIndex | null> => {
+  if (!indexPromise) {
+    indexPromise = fetch(CHAT_ANSWER_CACHE_URL)
+      .then(response => (response.ok ? response.json() : null))
+      .then(index => {
+        if (index && index.version !== CHAT_ANSWER_INDEX_VERSION) {
+          console.warn(`Chatbot yanıt önbelleği sürümü uyumsuz (beklenen ${CHAT_ANSWER_INDEX_VERSION}, gelen ${index.version}).`);
+          return null;
+        }
+        return (loadedIndex = index);
+      })
+      .catch(error => {
+        console.warn("Chatbot yanıt önbelleği yüklenemedi:", error);
+        return null;
+      });
+  }
+  return indexPromise;
+};
+
+/**
+ * Metni Türkçe kurallarına göre küçük harfe çevirir, aksanları kaldırır ve noktalama işaretlerini temizler.
+ * Not: tools/build_chat_answer_cache.py içindeki normalize_text ile birebir aynı kalmalıdır.
+ */
+const normalizeText = (text: string): string =>
+  text
+    .replace(/İ/g, 'i')
+    .replace(/I/g, 'ı')
+    .toLowerCase()
+    .replace(/ı/g, 'i')
+    .normalize('NFD')
+    .replace(/\p{M}/gu, '')
+    .replace(/[^\p{L}\p{N}\s]|_/gu, ' ')
+    .replace(/\s+/g, ' ')
+    .trim();
+
+// Her kelimeyi boşluklarla çevreleyerek karakter n-gram frekanslarını çıkarır.
+const extractNgrams = (text: string, size: number): Map<string, number> => {
+  const counts = new Map<string, number>();
+  for (const word of normalizeText(text).split(' ')) {
+    if (!word) continue;
+    const padded = ` ${word} `;
+    for (let i = 0; i < Math.max(1, padded.length - size + 1); i++) {
+      const gram = padded.slice(i, i + size);
+      counts.set(gram, (counts.get(gram) ?? 0) + 1);
+    }
+  }
+  return counts;
+};
+
+// Seçilen kayıt için kullanıcıya gösterilecek yanıt metnini üretir.
+// Süre dizinde bulunur; malzemeler ve talimatlar için tarif belgesi Firestore'dan okunur (bulunamazsa null).
+const formatAnswer = async (index: ChatAnswerIndex, entryIdx: number, intent: RecipeIntent | null): Promise<string | null> => {
+  const [recipeIdx, answerIdx] = index.entries[entryIdx];
+  if (recipeIdx < 0) {
+    return index.answers[answerIdx];
+  }
+  const [recipeId, name, minutes] = index.recipes[recipeIdx];
+  if (intent === 'time') {
+    return `${name} için toplam hazırlama ve pişirme süresi yaklaşık ${minutes} dakikadır.`;
+  }
+  const recipe = await getRecipeDocById(recipeId);
+  if (!recipe) return null;
+  if (intent === 'ingredients') {
+    return `${name} malzemeleri:\n` + recipe.ingredients.map(item => `- ${item}`).join('\n');
+  }
+  return `${name} nasıl yapılır:\n` + recipe.instructions.map((step, i) => `${i + 1}. ${step}`).join('\n');
+};
+
+/**
+ * Metne kosinüs benzerliği en yüksek kaydı bulur; yalnızca küratörlü ya da yalnızca tarif kayıtları aranır.
+ * Dizinde olmayan n-gramlar sorgu normuna en yüksek IDF ile katılır; böylece alakasız sorular eşiği geçemez.
+ */
+const nearestEntry = (index: ChatAnswerIndex, text: string, curated: boolean): [number, number] => {
+  const scores = new Map<number, number>();
+  let normSq = 0;
+  for (const [gram, count] of extractNgrams(text, index.ngramSize)) {
+    const term = index.vocabulary[gram];
+    if (!term) {
+      normSq += (count * index.unknownIdf) ** 2;
+      continue;
+    }
+    const [idf, postings] = term;
+    normSq += (count * idf) ** 2;
+    let entryIdx = 0;
+    for (const delta of postings) {
+      entryIdx += delta;
+      if ((index.entries[entryIdx][0] < 0) === curated) {
+        scores.set(entryIdx, (scores.get(entryIdx) ?? 0) + count * idf * idf);
+      }
+    }
+  }
+
+  let bestIdx = -1;
+  let bestScore = 0;
+  for (const [entryIdx, dot] of scores) {
+    const score = dot / index.norms[entryIdx];
+    if (score > bestScore) {
+      bestIdx = entryIdx;
+      bestScore = score;
+    }
+  }
+  return [bestIdx, bestIdx < 0 ? 0 : bestScore / Math.sqrt(normSq)];
+};
+
+// findCachedAnswer tarafından kullanılan arama adımları (bkz. aşağıdaki açıklama).
+const lookupAnswer = async (index: ChatAnswerIndex, message: string): Promise<string | null> => {
+  const text = normalizeText(message);
+  let padded = ` ${text} `;
+  const [curatedIdx, curatedScore] = nearestEntry(index, text, true);
+  if (curatedIdx >= 0 && curatedScore >= index.thresholds.curated) {
+    const keywords = index.answerKeywords[index.entries[curatedIdx][1]];
+    if (keywords.every(group => group.some(phrase => padded.includes(` ${phrase} `)))) {
+      return formatAnswer(index, curatedIdx, null);
+    }
+  }
+
+  const intents = new Set<RecipeIntent>();
+  for (const [pattern, intent] of index.intentPatterns) {
+    if (padded.includes(` ${pattern} `)) {
+      intents.add(intent);
+      padded = padded.replace(` ${pattern} `, ' ');
+    }
+  }
+  if (intents.size !== 1) return null;
+
+  const remainder = padded.split(' ').filter(word => word && !index.fillerWords.includes(word)).join(' ');
+  if (!remainder) return null;
+
+  const [recipeIdx, recipeScore] = nearestEntry(index, remainder, false);
+  if (recipeIdx < 0 || recipeScore < index.thresholds.recipe) {
+    return null;
+  }
+  return formatAnswer(index, recipeIdx, [...intents][0]);
+};
+
+/**
+ * findCachedAnswer - Yerel Yanıt Araması
+ * 1. Soru küratörlü soru kalıplarından birine yeterince benziyorsa ve o sorunun anahtar kelimelerini içeriyorsa o yanıt döner.
+ * 2. Aksi halde soruda tam olarak bir soru türüne (süre, malzemeler, yapılış) ait kalıp bulunmalıdır;
+ *    kalıp ve dolgu kelimeleri çıkarıldıktan sonra kalan metin bir tarif adına eşik üzerinde benzemelidir.
+ * Not: tools/build_chat_answer_cache.py içindeki lookup ile aynı mantığı izler.
+ * Dizin henüz yüklenmediyse beklenmez: indirme başlatılır ve mesaj doğrudan Gemini'ye gider.
+ * Arama sırasında oluşan her hata (bozuk dizin, Firestore hatası) eşleşme yok olarak değerlendirilir.
+ * Malzeme ve yapılış yanıtları için yalnızca eşleşen tarifin belgesi okunur.
+ * @param message - Kullanıcının sorusu.
+ * @returns Eşleşme varsa yerel yanıt, aksi halde null (soru Gemini'ye gönderilmelidir).
+ */
+export const findCachedAnswer = async (message: string): Promise<string | null> => {
+  const index = loadedIndex;
+  if (!index) {
+    preloadChatAnswerIndex();
+    return null;
+  }
+
+  try {
+    return await lookupAnswer(index, message);
+  } catch (error) {
+    console.warn("Chatbot yanıt önbelleğinde arama başarısız oldu:", error);
+    return null;
+  }
+};
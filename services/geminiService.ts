@@ -2,8 +2,9 @@
 // Bu modül, uygulamanın Yapay Zeka (AI) yeteneklerini yöneten servis katmanıdır.
 // Google Gemini API ile iletişim kurarak akıllı tarif önerileri ve sohbet botu (Chatbot) fonksiyonlarını sağlar.
 
-import { GoogleGenAI, Type, Chat } from "@google/genai";
+import { GoogleGenAI, Type, Chat, type Content } from "@google/genai";
 import { type AiRecipeSuggestion } from '../types';
+import { findCachedAnswer } from './chatCacheService';
 
 // Not: API anahtarı ortam değişkenlerinden (environment variables) dinamik olarak yüklenir.
 // Frontend'e asla expose edilmemelidir. Backend proxy veya environment değişken kullanılmalıdır.
@@ -163,16 +164,25 @@ export const getRecipeSuggestions = async (
 // 'systemInstruction' ile modele bir "Persona" (Kişilik) atanır.
 let chatbotInstance: any = null;
 
+// Yerel önbellekten yanıtlanan ve henüz sohbet oturumuna eklenmemiş mesajlar.
+// Bir sonraki Gemini isteğinden önce oturum geçmişine eklenir; böylece
+// "peki kaç kişilik?" gibi takip soruları önceki bağlamı kaybetmez.
+let pendingHistory: Content[] = [];
+
 const getChatbot = () => {
-  if (!chatbotInstance) {
+  if (!chatbotInstance || pendingHistory.length > 0) {
     const ai = getAi();
+    // Chat oturumuna sonradan mesaj eklenemediği için oturum, mevcut geçmiş ve bekleyen yerel mesajlarla yeniden oluşturulur.
+    const history: Content[] = [...(chatbotInstance ? chatbotInstance.getHistory() : []), ...pendingHistory];
     chatbotInstance = ai.chats.create({
       model: 'gemini-2.5-flash',
       config: {
         // Sistem Talimatı: Modelin rolünü, uzmanlık alanını ve iletişim tonunu belirler.
         systemInstruction: 'Sen Türk mutfağı konusunda uzman, yardımsever bir aşçısın. Adın "Akıllı Yardımcı". Kullanıcılara tarifler bulmalarında, yemek pişirme teknikleri hakkında bilgi vermede ve malzemeler hakkında sorularını yanıtlamada yardımcı ol. Cevapların samimi, anlaşılır ve teşvik edici olsun. Cevaplarını markdown formatında verme, düz metin kullan.',
       },
+      history,
     });
+    pendingHistory = [];
   }
   return chatbotInstance;
 };
@@ -194,6 +204,17 @@ export const sendMessageToBot = async (message: string): Promise<string> => {
     throw new Error("Mesaj çok uzun. Lütfen 2000 karakterden kısa bir mesaj gönderin.");
   }
 
+  // Yerel yanıt önbelleği: Tariflerden veya sık sorulan sorulardan yanıtlanabilen sorular
+  // Gemini'ye gönderilmeden anında yanıtlanır. Eşleşme yoksa soru sohbet oturumuna iletilir.
+  const cachedAnswer = await findCachedAnswer(message);
+  if (cachedAnswer) {
+    pendingHistory.push(
+      { role: 'user', parts: [{ text: message }] },
+      { role: 'model', parts: [{ text: cachedAnswer }] },
+    );
+    return cachedAnswer;
+  }
+
   try {
     // Mevcut sohbet geçmişini koruyarak yeni mesajı gönder.
     const chatbot = getChatbot();
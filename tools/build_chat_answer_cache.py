@@ -0,0 +1,420 @@
+# build_chat_answer_cache.py - Chatbot için yerel yanıt önbelleği (TF-IDF karakter n-gram dizini) oluşturan Python betiği
+
+import json
+import math
+import os
+import re
+import unicodedata
+
+
+# ----------------------------------------------------
+# 1. Ayarlar
+# ----------------------------------------------------
+
+# Dizine eklenecek tarif dosyaları (ana yemekler ve tatlılar)
+INPUT_JSON_FILES = ['food_final.json', 'final.json']
+
+# Çıktı dosyası: Vite 'public' klasöründeki dosyaları kök dizinden sunar (/chat_answer_cache.json)
+OUTPUT_JSON_FILE = os.path.join('..', 'public', 'chat_answer_cache.json')
+
+# Dosya biçimi sürümü: services/chatCacheService.ts içindeki CHAT_ANSWER_INDEX_VERSION ile aynı olmalıdır.
+# Biçim değiştiğinde artırılır; uygulama farklı sürümlü (eski) bir dosyayı yok sayar ve soruları Gemini'ye gönderir.
+INDEX_VERSION = 4
+
+NGRAM_SIZE = 3 # Karakter n-gram uzunluğu (kelime sınırları boşlukla doldurulur)
+WEIGHT_PRECISION = 3 # IDF ve norm değerlerinin ondalık basamak sayısı (dosya boyutunu küçültür)
+
+# Benzerlik eşikleri LABELLED_QUERIES üzerinde seçildi: yanlış yanıt vermektense soru Gemini'ye gönderilir.
+RECIPE_NAME_THRESHOLD = 0.9 # Soru türü kalıbı çıkarıldıktan sonra kalan metnin tarif adına benzerliği
+CURATED_THRESHOLD = 0.7 # Sorunun küratörlü soru kalıplarından birine benzerliği
+
+# Her tarif için yanıtlanabilen soru türleri ve bu türü belirleyen ifade kalıpları.
+# Tarif yanıtı için soruda tam olarak bir türe ait kalıp bulunmalıdır; yalnızca tarif adının
+# geçmesi yeterli değildir ("kuru fasulye kaç kalori" Gemini'ye gönderilir).
+RECIPE_INTENTS = {
+    "time": [
+        "kaç dakikada pişer", "kaç dakikada pişirilir", "kaç dakikada hazırlanır", "kaç dakikada yapılır",
+        "kaç dakika sürer", "kaç dakika pişer", "kaç saatte pişer", "kaç saat sürer",
+        "ne kadar sürede pişer", "ne kadar sürede yapılır", "ne kadar sürede hazırlanır", "ne kadar sürer",
+        "pişirme süresi", "hazırlama süresi", "hazırlanma süresi", "süresi ne kadar",
+    ],
+    "ingredients": [
+        "malzemeleri nelerdir", "malzemeleri neler", "malzemeleri nedir", "malzemeleri", "malzemesi",
+        "için ne gerekir", "için neler gerekir", "için gerekenler", "için gereken malzemeler",
+    ],
+    "instructions": [
+        "nasıl yapılır", "nasıl pişirilir", "nasıl hazırlanır", "yapılışı nedir", "yapılışı",
+        "tarifi nedir", "tarifini ver", "tarifi ver", "tarifi",
+    ],
+}
+
+# Soru türü kalıbı çıkarıldıktan sonra, kalan metin tarif adıyla karşılaştırılmadan önce atılan dolgu kelimeleri
+FILLER_WORDS = ["acaba", "lütfen", "peki", "bana", "bir", "için"]
+
+# Küratörlü sık sorulan sorular: her soru kalıbı ayrı bir kayıt olarak dizine eklenir.
+# "keywords": Benzerlik eşiği tek başına yeterli değildir ("tarifi nasıl indiririm" ile "tarifi nasıl değerlendiririm"
+# karakter düzeyinde çok benzer). Yanıt için soruda her gruptan en az bir ifade tam kelime olarak geçmelidir.
+CURATED_QUESTIONS = [
+    {
+        "questions": ["sen kimsin", "adın ne", "akıllı yardımcı nedir"],
+        "keywords": [["kimsin", "adın", "akıllı yardımcı"]],
+        "answer": "Ben Akıllı Yardımcı! Türk mutfağı tariflerini bulmana, malzemeler ve pişirme teknikleri hakkındaki sorularını yanıtlamana yardımcı oluyorum.",
+    },
+    {
+        "questions": ["tarifi favorilere nasıl eklerim", "favorilere nasıl eklerim", "favori tariflerim nerede"],
+        "keywords": [["favorilere", "favorilerime", "favori"], ["eklerim", "ekleyebilirim", "nerede"]],
+        "answer": "Bir tarifi favorilerine eklemek için giriş yaptıktan sonra tarif kartındaki kalp simgesine tıklayabilirsin. Favori tariflerini üst menüdeki Favorilerim sayfasında bulabilirsin.",
+    },
+    {
+        "questions": ["tarife nasıl puan veririm", "tarifi nasıl değerlendiririm"],
+        "keywords": [["puan", "değerlendiririm", "puanlarım"]],
+        "answer": "Bir tarifi puanlamak için giriş yapıp tarif detayını açman yeterli. Detay penceresinde 1 ile 5 arasında puan verebilir ve yorum ekleyebilirsin.",
+    },
+    {
+        "questions": ["elimdeki malzemelerle ne yapabilirim", "malzemelere göre tarif öner"],
+        "keywords": [["malzemelerle", "malzemelere", "malzemelerimle"]],
+        "answer": "Elindeki malzemeleri Akıllı Şef bölümüne yazarsan sana uygun ana yemek veya tatlı tarifleri önerebilirim.",
+    },
+    {
+        "questions": ["kaç tarif var", "sitede kaç tarif bulunuyor"],
+        "keywords": [["kaç tarif"]],
+        "answer": "Sitemizde {recipe_count} Türk mutfağı tarifi bulunuyor. Ana yemekleri ve tatlıları filtreleyerek inceleyebilirsin.",
+    },
+]
+
+# Eşikleri seçmek ve dizini doğrulamak için etiketli sorgular.
+# Beklenen sonuç: (tarif adı, soru türü), ("faq", CURATED_QUESTIONS indeksi) veya None (Gemini'ye gönderilmeli).
+LABELLED_QUERIES = [
+    # Tarif soruları (yerel yanıt beklenir)
+    ("baklava kaç dakikada pişer?", ("Baklava", "time")),
+    ("Baklava ne kadar sürer", ("Baklava", "time")),
+    ("karnıyarık kaç dakikada pişer", ("Karnıyarık", "time")),
+    ("mantı hazırlama süresi", ("Mantı", "time")),
+    ("İskender kebap ne kadar sürede hazırlanır", ("İskender Kebap", "time")),
+    ("Döner Kebap malzemeleri nelerdir", ("Döner Kebap", "ingredients")),
+    ("karnıyarık için ne gerekir", ("Karnıyarık", "ingredients")),
+    ("kuru fasulye malzemeleri", ("Kuru Fasulye", "ingredients")),
+    ("künefe için gerekenler", ("Künefe", "ingredients")),
+    ("tavuk göğsü malzemeleri neler", ("Tavuk Göğsü", "ingredients")),
+    ("sutlac nasil yapilir", ("Sütlaç", "instructions")),
+    ("SÜTLAÇ NASIL YAPILIR", ("Sütlaç", "instructions")),
+    ("mercimek çorbası tarifi", ("Mercimek Çorbası", "instructions")),
+    ("tavuk sote nasıl yapılır", ("Tavuk Sote", "instructions")),
+    ("imam bayıldı nasıl yapılır", ("İmam Bayıldı", "instructions")),
+    ("hünkar beğendi tarifi", ("Hünkar Beğendi", "instructions")),
+    ("lütfen bana revani tarifi ver", ("Revani", "instructions")),
+    ("menemen nasıl pişirilir?", ("Menemen", "instructions")),
+    ("şekerpare yapılışı", ("Şekerpare", "instructions")),
+    ("aşure nasıl yapılır", ("Aşure", "instructions")),
+    ("kuymak nasıl yapılır", ("Kuymak (Mıhlama)", "instructions")),
+    # Küratörlü sorular
+    ("favorilere nasıl eklerim", ("faq", 1)),
+    ("sen kimsin?", ("faq", 0)),
+    ("tarife nasıl puan veririm", ("faq", 2)),
+    ("sitede kaç tarif var", ("faq", 4)),
+    ("favori tariflerim nerede", ("faq", 1)),
+    ("tarifi favorilerime nasıl eklerim", ("faq", 1)),
+    ("tarifi nasıl değerlendiririm", ("faq", 2)),
+    ("elimdeki malzemelerle ne yapabilirim", ("faq", 3)),
+    # Yerel olarak yanıtlanmaması gereken sorular
+    ("kuru fasulye kaç kalori", None),
+    ("karnıyarık kaç kalori", None),
+    ("mercimek çorbası kaç kalori", None),
+    ("kek nasıl yapılır", None),
+    ("ekmek nasıl yapılır", None),
+    ("pasta nasıl yapılır", None),
+    ("köfte malzemeleri", None),
+    ("pilav nasıl yapılır", None),
+    ("hünkar beğendi yerine ne yapabilirim", None),
+    ("baklava yanında ne içilir", None),
+    ("baklava tarifi ne kadar sürer", None),
+    ("vegan baklava nasıl yapılır", None),
+    ("glutensiz mantı tarifi", None),
+    ("sütlaç kaç kişilik", None),
+    ("peki kaç kişilik?", None),
+    ("bugün hava nasıl olacak", None),
+    ("merhaba", None),
+    ("çay nasıl demlenir", None),
+    ("bana bir tavuk tarifi öner", None),
+    ("baklava mı künefe mi daha kolay", None),
+    ("fırınsız tatlı tarifi", None),
+    ("tarifi nasıl kaydederim", None),
+    # Küratörlü sorulara karakter düzeyinde benzeyen ama farklı anlam taşıyan sorular
+    ("tarifi nasıl değiştiririm", None),
+    ("tarifi nasıl indiririm", None),
+    ("favorilerden nasıl silerim", None),
+    ("favorilere nasıl giderim", None),
+    ("tarifi nasıl eklerim", None),
+    ("kaç tane tatlı tarifi var", None),
+]
+
+
+# ----------------------------------------------------
+# 2. Metin işleme ve vektörleştirme
+# ----------------------------------------------------
+
+def normalize_text(text):
+    """
+    Metni Türkçe kurallarına göre küçük harfe çevirir, aksanları kaldırır ve noktalama işaretlerini temizler.
+    Not: services/chatCacheService.ts içindeki normalizeText ile birebir aynı kalmalıdır.
+    """
+    text = text.replace('İ', 'i').replace('I', 'ı').lower()
+    text = text.replace('ı', 'i')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^\w\s]|_", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def extract_ngrams(text):
+    """Her kelimeyi boşluklarla çevreleyerek karakter n-gram frekanslarını çıkarır."""
+    counts = {}
+    for word in normalize_text(text).split(' '):
+        if not word:
+            continue
+        padded = f" {word} "
+        for i in range(max(1, len(padded) - NGRAM_SIZE + 1)):
+            gram = padded[i:i + NGRAM_SIZE]
+            counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+def decode_postings(postings):
+    """Fark (delta) kodlu kayıt listesini çözer; aynı kaydın tekrarı n-gramın frekansını gösterir."""
+    entry_idx = 0
+    for delta in postings:
+        entry_idx += delta
+        yield entry_idx
+
+def nearest_entry(index, text, curated):
+    """
+    Metne kosinüs benzerliği en yüksek kaydı bulur; yalnızca küratörlü (curated=True) ya da yalnızca tarif kayıtları aranır.
+    Dizinde olmayan n-gramlar sorgu normuna en yüksek IDF ile katılır; böylece alakasız sorgular eşiği geçemez.
+    """
+    scores = {}
+    norm_sq = 0.0
+    for gram, count in extract_ngrams(text).items():
+        if gram not in index["vocabulary"]:
+            norm_sq += (count * index["unknownIdf"]) ** 2
+            continue
+        idf, postings = index["vocabulary"][gram]
+        norm_sq += (count * idf) ** 2
+        for entry_idx in decode_postings(postings):
+            if (index["entries"][entry_idx][0] < 0) == curated:
+                scores[entry_idx] = scores.get(entry_idx, 0.0) + count * idf * idf
+
+    if not scores:
+        return None, 0.0
+    best = max(scores, key=lambda entry_idx: scores[entry_idx] / index["norms"][entry_idx])
+    return best, scores[best] / index["norms"][best] / math.sqrt(norm_sq)
+
+def lookup(index, query):
+    """
+    Soruyu yerel olarak yanıtlanabilecek bir kayda eşler ve (kayıt indeksi, soru türü, benzerlik) döndürür.
+    1. Soru küratörlü soru kalıplarından birine yeterince benziyorsa ve o sorunun anahtar kelimelerini
+       içeriyorsa o yanıt seçilir.
+    2. Aksi halde soruda tam olarak bir soru türüne ait kalıp bulunmalıdır; kalıp ve dolgu kelimeleri
+       çıkarıldıktan sonra kalan metin bir tarif adına eşik üzerinde benzemelidir.
+    Eşleşme yoksa kayıt indeksi None olur ve soru Gemini'ye gönderilmelidir.
+    """
+    text = normalize_text(query)
+    padded = f" {text} "
+    entry_idx, score = nearest_entry(index, text, curated=True)
+    if entry_idx is not None and score >= index["thresholds"]["curated"]:
+        keywords = index["answerKeywords"][index["entries"][entry_idx][1]]
+        if all(any(f" {phrase} " in padded for phrase in group) for group in keywords):
+            return entry_idx, None, score
+
+    intents = set()
+    for pattern, intent in index["intentPatterns"]:
+        if f" {pattern} " in padded:
+            intents.add(intent)
+            padded = padded.replace(f" {pattern} ", " ", 1)
+    if len(intents) != 1:
+        return None, None, 0.0
+
+    remainder = " ".join(word for word in padded.split() if word not in index["fillerWords"])
+    if not remainder:
+        return None, None, 0.0
+    entry_idx, score = nearest_entry(index, remainder, curated=False)
+    if entry_idx is None or score < index["thresholds"]["recipe"]:
+        return None, None, score
+    return entry_idx, intents.pop(), score
+
+
+# ----------------------------------------------------
+# 3. Dizin oluşturma
+# ----------------------------------------------------
+
+def load_recipes(input_files):
+    """Tarif dosyalarını okur; kimliği olmayan ve aynı ada sahip tekrarlanan tarifleri atlar."""
+    recipes = []
+    seen_names = set()
+    for input_file in input_files:
+        try:
+            with open(input_file, 'r', encoding='utf-8') as f:
+                file_content = f.read()
+                json_text_cleaned = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]", "", file_content)
+                json_text_cleaned = json_text_cleaned.replace(u'\u00A0', ' ')
+                file_recipes = json.loads(json_text_cleaned)
+        except (json.JSONDecodeError, FileNotFoundError) as e:
+            print(f"JSON okuma hatası ({input_file}): {e}")
+            continue
+
+        for recipe in file_recipes:
+            name = recipe.get('name')
+            if not name or 'id' not in recipe or normalize_text(name) in seen_names:
+                continue
+            seen_names.add(normalize_text(name))
+            recipes.append(recipe)
+    return recipes
+
+def recipe_aliases(recipes):
+    """
+    Parantezli tarif adları için kısa ad üretir ("Katmer (Tuzlu)" -> "Katmer").
+    Birden fazla tarife ya da mevcut bir tarif adına denk gelen kısa adlar belirsiz olduğundan atlanır.
+    """
+    names = {normalize_text(recipe['name']) for recipe in recipes}
+    candidates = {}
+    for recipe_idx, recipe in enumerate(recipes):
+        short_name = re.sub(r"\s*\(.*?\)", "", recipe['name']).strip()
+        if short_name and short_name != recipe['name']:
+            candidates.setdefault(normalize_text(short_name), []).append((recipe_idx, short_name))
+    return [matches[0] for key, matches in candidates.items() if len(matches) == 1 and key not in names]
+
+def build_index(recipes):
+    """
+    Tarif adları ve küratörlü sorular için kayıtları oluşturur, TF-IDF vektörlerini hesaplar
+    ve en yakın komşu araması için ters dizin biçiminde döndürür.
+
+    Dosyayı küçük tutmak için ağırlıklar saklanmaz: n-gram başına IDF ve fark kodlu kayıt listesi,
+    kayıt başına da vektör normu tutulur. Ağırlık = frekans * IDF / norm olarak yeniden hesaplanır.
+    Malzemeler ve talimatlar da saklanmaz (dosyanın ~%85'ini oluşturuyordu); tarif yalnızca kimliği, adı ve
+    süresiyle tutulur, yanıt için gereken ayrıntılar uygulamada Firestore'daki tarif belgesinden okunur.
+    """
+    # Kayıt biçimi: tarif adları için [tarif indeksi, -1], küratörlü sorular için [-1, yanıt indeksi]
+    entries = []
+    documents = []
+    for recipe_idx, recipe in enumerate(recipes):
+        entries.append([recipe_idx, -1])
+        documents.append(recipe['name'])
+    for recipe_idx, short_name in recipe_aliases(recipes):
+        entries.append([recipe_idx, -1])
+        documents.append(short_name)
+
+    answers = []
+    answer_keywords = []
+    for item in CURATED_QUESTIONS:
+        answers.append(item["answer"].format(recipe_count=len(recipes)))
+        answer_keywords.append([[normalize_text(phrase) for phrase in group] for group in item["keywords"]])
+        for question in item["questions"]:
+            entries.append([-1, len(answers) - 1])
+            documents.append(question)
+
+    # Belge frekansları ve yumuşatılmış IDF değerleri
+    doc_counts = [extract_ngrams(doc) for doc in documents]
+    doc_freq = {}
+    for counts in doc_counts:
+        for gram in counts:
+            doc_freq[gram] = doc_freq.get(gram, 0) + 1
+    total_docs = len(documents)
+    idf = {gram: round(math.log((1 + total_docs) / (1 + df)) + 1, WEIGHT_PRECISION) for gram, df in doc_freq.items()}
+
+    vocabulary = {gram: [idf[gram], []] for gram in sorted(idf)}
+    last_entry = {gram: 0 for gram in idf}
+    norms = []
+    for entry_idx, counts in enumerate(doc_counts):
+        norms.append(round(math.sqrt(sum((count * idf[gram]) ** 2 for gram, count in counts.items())), WEIGHT_PRECISION))
+        for gram, count in counts.items():
+            vocabulary[gram][1].extend([entry_idx - last_entry[gram]] + [0] * (count - 1))
+            last_entry[gram] = entry_idx
+
+    # Kalıplar uzundan kısaya sıralanır; böylece "kaç dakikada pişer" gibi uzun kalıplar önce çıkarılır
+    intent_patterns = sorted(
+        ([normalize_text(pattern), intent] for intent, patterns in RECIPE_INTENTS.items() for pattern in patterns),
+        key=lambda item: -len(item[0])
+    )
+
+    return {
+        "version": INDEX_VERSION,
+        "ngramSize": NGRAM_SIZE,
+        "thresholds": {"recipe": RECIPE_NAME_THRESHOLD, "curated": CURATED_THRESHOLD},
+        "unknownIdf": round(math.log(1 + total_docs) + 1, WEIGHT_PRECISION),
+        "intentPatterns": intent_patterns,
+        "fillerWords": [normalize_text(word) for word in FILLER_WORDS],
+        "recipes": [[recipe['id'], recipe['name'], recipe.get('time', 0)] for recipe in recipes],
+        "answers": answers,
+        "answerKeywords": answer_keywords,
+        "entries": entries,
+        "norms": norms,
+        "vocabulary": vocabulary,
+    }
+
+def format_answer(index, entry_idx, intent, recipes_by_id):
+    """
+    Kayıt için yanıt metnini üretir (services/chatCacheService.ts içindeki formatAnswer ile aynı).
+    Malzemeler ve talimatlar dizinde bulunmadığından kimliğe göre tam tarif verisinden (recipes_by_id) okunur.
+    """
+    recipe_idx, answer_idx = index["entries"][entry_idx]
+    if recipe_idx < 0:
+        return index["answers"][answer_idx]
+    recipe_id, name, minutes = index["recipes"][recipe_idx]
+    if intent == "time":
+        return f"{name} için toplam hazırlama ve pişirme süresi yaklaşık {minutes} dakikadır."
+    recipe = recipes_by_id[recipe_id]
+    if intent == "ingredients":
+        return f"{name} malzemeleri:\n" + "\n".join(f"- {item}" for item in recipe.get('ingredients', []))
+    return f"{name} nasıl yapılır:\n" + "\n".join(f"{i + 1}. {step}" for i, step in enumerate(recipe.get('instructions', [])))
+
+def evaluate(index, labelled_queries):
+    """
+    Etiketli sorguları dizinde arar ve sonuçları doğru, yanlış yanıt ve kaçırılan olarak sınıflandırır.
+    Yanlış yanıt (başka bir tarif/tür ya da yanıtlanmaması gereken bir soruya yanıt) en ağır hatadır.
+    """
+    report = {"correct": [], "wrong": [], "missed": []}
+    for query, expected in labelled_queries:
+        entry_idx, intent, score = lookup(index, query)
+        if entry_idx is None:
+            actual = None
+        else:
+            recipe_idx, answer_idx = index["entries"][entry_idx]
+            actual = ("faq", answer_idx) if recipe_idx < 0 else (index["recipes"][recipe_idx][1], intent)
+
+        if actual == expected:
+            report["correct"].append((query, actual, score))
+        elif actual is None:
+            report["missed"].append((query, expected, score))
+        else:
+            report["wrong"].append((query, actual, score))
+    return report
+
+
+def main():
+    """
+    Tarifleri okuyan, dizini oluşturan, çıktı dosyasına kaydeden ve etiketli sorgularla doğrulayan ana işlev.
+    """
+    print("--- Chatbot yanıt önbelleği oluşturuluyor ---")
+
+    recipes = load_recipes(INPUT_JSON_FILES)
+    if not recipes:
+        print("Hata: Dizine eklenecek tarif bulunamadı.")
+        return
+
+    index = build_index(recipes)
+    print(f"{len(recipes)} tarif ve {len(index['entries'])} kayıt dizine eklendi ({len(index['vocabulary'])} n-gram).")
+
+    os.makedirs(os.path.dirname(OUTPUT_JSON_FILE), exist_ok=True)
+    with open(OUTPUT_JSON_FILE, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"Önbellek dosyası kaydedildi: {OUTPUT_JSON_FILE} ({os.path.getsize(OUTPUT_JSON_FILE) // 1024} KB)")
+
+    # Etiketli sorgularla doğrulama
+    report = evaluate(index, LABELLED_QUERIES)
+    print(f"\n--- Etiketli sorgular (tarif eşiği: {RECIPE_NAME_THRESHOLD}, SSS eşiği: {CURATED_THRESHOLD}) ---")
+    print(f"Doğru: {len(report['correct'])}, Yanlış yanıt: {len(report['wrong'])}, Kaçırılan: {len(report['missed'])}")
+    for query, actual, score in report["wrong"]:
+        print(f"  [YANLIŞ {score:.2f}] {query} -> {actual}")
+    for query, expected, score in report["missed"]:
+        print(f"  [KAÇIRILDI {score:.2f}] {query} (beklenen: {expected})")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,7 +31,11 @@ FILES_TO_PROCESS = [
 
 # API ayarları
 GEMINI_MODEL = "gemini-2.5-flash-lite"
-GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
+# Yerel bir sahte (mock) sunucuya karşı çalıştırmak için GEMINI_API_BASE ortam değişkeni ayarlanabilir.
+GEMINI_API_BASE = os.environ.get("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta").rstrip("/")
+GEMINI_API_URL = f"{GEMINI_API_BASE}/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
+COUNT_TOKENS_URL = f"{GEMINI_API_BASE}/models/{GEMINI_MODEL}:countTokens?key={GEMINI_API_KEY}"
+CACHED_CONTENTS_URL = f"{GEMINI_API_BASE}/cachedContents"
 DELAY_BETWEEN_CALLS = 3 # Her API isteği arasında zorunlu gecikme (saniye cinsinden)
 
 # 429 hatası için yeniden deneme ayarları
@@ -39,6 +43,15 @@ MAX_RETRIES = 5
 BASE_DELAY = 2 # İlk bekleme süresi saniye cinsinden (2, 4, 8, 16, 32)
 SAVE_INTERVAL = 10 # Otomatik geçici kaydından önce tarif sayısı
 
+# Bağlam önbelleği (context caching) ayarları
+USE_CONTEXT_CACHE = True # Sabit sistem talimatı her istekte yeniden gönderilmesin
+# Gemini 2.5 Flash ve Flash-Lite için açık önbelleğin kabul ettiği en küçük içerik (token).
+# Not: Mevcut SYSTEM_PROMPT bu sınırın çok altındadır (~60 token); bu nedenle şu an önbellek
+# oluşturulmaz ve istekler kısa sistem talimatıyla satır içi gönderilir. Talimat büyüdüğünde önbellek kendiliğinden devreye girer.
+MIN_CACHE_TOKENS = 1024
+CACHE_TTL_SECONDS = 600 # Önbelleğin yaşam süresi (saniye cinsinden)
+CACHE_RENEW_MARGIN = 60 # Süre dolmadan bu kadar saniye önce önbellek yenilenir
+
 # JSON modu (JSON Schema) - çıktıların yapılandırılmış olduğundan emin olmak için
 RESPONSE_SCHEMA = {
     "type": "OBJECT",
@@ -58,6 +71,24 @@ RESPONSE_SCHEMA = {
     "required": ["ingredients", "instructions"]
 }
 
+# Sistem talimatları (modelin rolünü profesyonel bir aşçı olarak belirleme)
+SYSTEM_PROMPT = (
+    "Sen Türk mutfağında uzman profesyonel bir aşçısın. Görevin, 'Türk Tatlısı' tarifleri için "
+    "ayrıntılı malzemeler listesi (miktarlarıyla birlikte) ve adım adım pişirme talimatları oluşturmaktır. "
+    "Çıktı YALNIZCA belirlenen şemaya uygun bir JSON olmalıdır."
+)
+
+# Önbelleğin mevcut durumu (ad, yerel bitiş zamanı ve token istatistikleri)
+CACHE_STATE = {
+    "name": None,
+    "expires_at": 0,
+    "token_count": 0,
+    "prefix_tokens": None,
+    "disabled": False,
+    "cached_tokens": 0,
+    "prompt_tokens": 0,
+}
+
 def save_current_recipes(recipes_list, output_file):
     """Tarifler'in mevcut durumunu güvenli bir şekilde çıktı dosyasına kaydedin."""
     try:
@@ -66,17 +97,165 @@ def save_current_recipes(recipes_list, output_file):
     except Exception as e:
         print(f"     -> Dosya {output_file} için geçici kayıt hatası: {e}")
 
+def build_system_instruction():
+    """
+    Sabit sistem talimatını oluşturur. Önbellekli ve önbelleksiz istekler aynı talimatı kullanır.
+    Şema yalnızca 'generationConfig.responseSchema' ile gönderilir; talimata metin olarak eklenmez.
+    """
+    return {"parts": [{"text": SYSTEM_PROMPT}]}
+
+def count_prefix_tokens():
+    """Önbelleğe alınacak sabit talimatın token sayısını 'countTokens' ile öğrenir; başarısız olursa None döner."""
+    payload = {"contents": [{"role": "user", "parts": build_system_instruction()["parts"]}]}
+    try:
+        response = requests.post(COUNT_TOKENS_URL, json=payload, timeout=30)
+    except requests.exceptions.RequestException as e:
+        print(f"     -> Token sayısı alınamadı (İstek Hatası): {e}")
+        return None
+
+    if response.status_code != 200:
+        print(f"     -> Token sayısı alınamadı (Durum: {response.status_code}): {response.text[:100]}...")
+        return None
+    return response.json().get("totalTokens")
+
+def invalidate_prompt_cache():
+    """
+    Sunucudaki önbellek kaynağını siler ve yerel kaydı temizler; bir sonraki istekte yeni önbellek oluşturulur.
+    Kaynak zaten silinmişse (404) hata yok sayılır.
+    """
+    name = CACHE_STATE["name"]
+    CACHE_STATE["name"] = None
+    CACHE_STATE["expires_at"] = 0
+    if not name:
+        return
+
+    try:
+        response = requests.delete(f"{GEMINI_API_BASE}/{name}?key={GEMINI_API_KEY}", timeout=30)
+        if response.status_code not in (200, 404):
+            print(f"     -> Önbellek silinemedi (Durum: {response.status_code}): {name}")
+    except requests.exceptions.RequestException as e:
+        print(f"     -> Önbellek silinemedi (İstek Hatası): {e}")
+
+def is_cache_error(response):
+    """Hata yanıtının önbelleğe alınmış içeriğin bulunamadığını (silinmiş/süresi dolmuş) belirtip belirtmediğini kontrol eder."""
+    body = response.text.lower()
+    return "cachedcontent" in body or "cached content" in body
+
+def is_cache_unsupported(response):
+    """
+    Önbellek oluşturma hatasının kalıcı olup olmadığını kontrol eder: içerik minimum token sınırının
+    altında kalıyorsa veya model bağlam önbelleğini desteklemiyorsa tekrar denemenin anlamı yoktur.
+    """
+    if response.status_code != 400:
+        return False
+    body = response.text.lower()
+    return any(hint in body for hint in ("token count", "too small", "minimum", "not supported", "does not support"))
+
+def create_prompt_cache():
+    """
+    Sabit sistem talimatı için Gemini 'cachedContents' kaynağı oluşturur.
+    Talimat MIN_CACHE_TOKENS sınırının altındaysa istek hiç gönderilmez ve önbellek devre dışı bırakılır.
+    Hata kalıcıysa (ör. model önbelleği desteklemiyor) önbellek yine devre dışı bırakılır;
+    geçici hatalarda None döner ve bir sonraki istekte yeniden denenir.
+    """
+    if CACHE_STATE["prefix_tokens"] is None:
+        CACHE_STATE["prefix_tokens"] = count_prefix_tokens()
+    if CACHE_STATE["prefix_tokens"] is not None and CACHE_STATE["prefix_tokens"] < MIN_CACHE_TOKENS:
+        print(f"     -> Sistem talimatı {CACHE_STATE['prefix_tokens']} token; önbellek için en az {MIN_CACHE_TOKENS} token gerekir.")
+        print("     -> Bağlam önbelleği devre dışı; istekler kısa sistem talimatıyla gönderilecek.")
+        CACHE_STATE["disabled"] = True
+        return None
+
+    payload = {
+        "model": f"models/{GEMINI_MODEL}",
+        "displayName": "turk-mutfagi-tarif-uretici",
+        "systemInstruction": build_system_instruction(),
+        "ttl": f"{CACHE_TTL_SECONDS}s"
+    }
+
+    try:
+        response = requests.post(f"{CACHED_CONTENTS_URL}?key={GEMINI_API_KEY}", json=payload, timeout=30)
+    except requests.exceptions.RequestException as e:
+        print(f"     -> Önbellek oluşturulamadı (İstek Hatası): {e}")
+        return None
+
+    if response.status_code != 200:
+        print(f"     -> Önbellek oluşturulamadı (Durum: {response.status_code}): {response.text[:100]}...")
+        if is_cache_unsupported(response):
+            print("     -> Bağlam önbelleği devre dışı; istekler kısa sistem talimatıyla gönderilecek.")
+            CACHE_STATE["disabled"] = True
+        # 429 ve 5xx gibi geçici hatalarda önbellek bir sonraki istekte yeniden denenir
+        return None
+
+    result = response.json()
+    CACHE_STATE["name"] = result.get("name")
+    CACHE_STATE["expires_at"] = time.time() + CACHE_TTL_SECONDS
+    CACHE_STATE["token_count"] = result.get("usageMetadata", {}).get("totalTokenCount", 0)
+    print(f"     -> Önbellek oluşturuldu: {CACHE_STATE['name']} ({CACHE_STATE['token_count']} token)")
+    return CACHE_STATE["name"]
+
+def renew_prompt_cache():
+    """
+    Mevcut önbelleğin süresini TTL kadar uzatır. Önbellek sunucuda yoksa (404 veya önbellek hatası) yenisini oluşturur.
+    Geçici hatalarda (429, 5xx, ağ hatası) süresi henüz dolmamış önbellek korunur ve bir sonraki istekte yeniden denenir.
+    """
+    name = CACHE_STATE["name"]
+    try:
+        response = requests.patch(
+            f"{GEMINI_API_BASE}/{name}?key={GEMINI_API_KEY}&updateMask=ttl",
+            json={"ttl": f"{CACHE_TTL_SECONDS}s"},
+            timeout=30
+        )
+    except requests.exceptions.RequestException as e:
+        print(f"     -> Önbellek yenilenemedi (İstek Hatası): {e}")
+        return name
+
+    if response.status_code == 200:
+        CACHE_STATE["expires_at"] = time.time() + CACHE_TTL_SECONDS
+        print(f"     -> Önbellek süresi uzatıldı: {name}")
+        return name
+
+    if response.status_code == 404 or is_cache_error(response):
+        print(f"     -> Önbellek bulunamadı (Durum: {response.status_code}), yeniden oluşturuluyor...")
+        invalidate_prompt_cache()
+        return create_prompt_cache()
+
+    print(f"     -> Önbellek yenilenemedi (Durum: {response.status_code}), sonraki istekte yeniden denenecek.")
+    return name
+
+def get_prompt_cache():
+    """
+    Kullanılabilir önbellek adını döndürür. Gerekirse önbelleği oluşturur veya
+    süresi dolmak üzereyse yeniler. Önbellek kullanılamıyorsa None döner.
+    """
+    if not USE_CONTEXT_CACHE or CACHE_STATE["disabled"]:
+        return None
+
+    if not CACHE_STATE["name"] or time.time() >= CACHE_STATE["expires_at"]:
+        invalidate_prompt_cache()
+        return create_prompt_cache()
+
+    if CACHE_STATE["expires_at"] - time.time() < CACHE_RENEW_MARGIN:
+        return renew_prompt_cache()
+
+    return CACHE_STATE["name"]
+
+def record_prompt_usage(usage):
+    """
+    Yanıttaki token kullanımını kaydeder. Önbellekten okunan token'lar ücretsiz değildir: indirimli ücretle
+    faturalanır ve önbelleğin saklama ücreti ayrıca ödenir; bu nedenle tasarruf olarak değil ayrı olarak raporlanır.
+    """
+    prompt_tokens = usage.get("promptTokenCount", 0)
+    cached_tokens = usage.get("cachedContentTokenCount", 0)
+    CACHE_STATE["prompt_tokens"] += prompt_tokens
+    CACHE_STATE["cached_tokens"] += cached_tokens
+    print(f"     -> İstem token sayısı: {prompt_tokens} (önbellekten okunan: {cached_tokens})")
+
 def generate_recipe_content(recipe_name, cuisine, attempt_num):
     """
     JSON biçiminde malzemeleri ve yapılış yöntemini oluşturmak için Gemini API'ye bağlanır.
+    Mümkünse sabit sistem talimatı önbelleğe alınmış içerik üzerinden gönderilir.
     """
-    
-    # Sistem talimatları (modelin rolünü profesyonel bir aşçı olarak belirleme)
-    system_prompt = (
-        "Sen Türk mutfağında uzman profesyonel bir aşçısın. Görevin, 'Türk Tatlısı' tarifleri için "
-        "ayrıntılı malzemeler listesi (miktarlarıyla birlikte) ve adım adım pişirme talimatları oluşturmaktır. "
-        "Çıktı YALNIZCA belirlenen şemaya uygun bir JSON olmalıdır."
-    )
 
     # Kullanıcı sorgusu (porsiyon sayısı 2 olarak ayarlandı)
     user_query = (
@@ -87,13 +266,19 @@ def generate_recipe_content(recipe_name, cuisine, attempt_num):
 
     payload = {
         "contents": [{"parts": [{"text": user_query}]}],
-        "systemInstruction": {"parts": [{"text": system_prompt}]},
         "generationConfig": {
             "responseMimeType": "application/json",
             "responseSchema": RESPONSE_SCHEMA
         }
     }
 
+    # Önbellek varsa sistem talimatı tekrar gönderilmez; yalnızca önbellek adı eklenir.
+    cache_name = get_prompt_cache()
+    if cache_name:
+        payload["cachedContent"] = cache_name
+    else:
+        payload["systemInstruction"] = build_system_instruction()
+
     headers = {'Content-Type': 'application/json'}
     
     try:
@@ -104,12 +289,28 @@ def generate_recipe_content(recipe_name, cuisine, attempt_num):
         if response.status_code == 429:
             # Üstel Geri Alma yeniden deneme mantığını uygulamak için 429 durumunu döndür
             return {"error": "Quota Exceeded", "status": 429}
-            
+
+        # Önbellek sunucu tarafında silinmiş veya süresi dolmuşsa yeniden oluşturup tekrar dene.
+        # Önbellekle ilgisi olmayan 4xx hataları aşağıda normal API hatası olarak işlenir.
+        if cache_name and response.status_code in (400, 403, 404) and is_cache_error(response):
+            print(f"     -> Önbellek geçersiz (Durum: {response.status_code}), yeniden oluşturuluyor...")
+            invalidate_prompt_cache()
+            payload.pop("cachedContent", None)
+            cache_name = get_prompt_cache()
+            if cache_name:
+                payload["cachedContent"] = cache_name
+            else:
+                payload["systemInstruction"] = build_system_instruction()
+            response = requests.post(GEMINI_API_URL, headers=headers, json=payload, timeout=60)
+            if response.status_code == 429:
+                return {"error": "Quota Exceeded", "status": 429}
+
         if response.status_code != 200:
             print(f"     -> API Hatası (Durum: {response.status_code}): {response.text[:100]}...")
             return None
 
         result = response.json()
+        record_prompt_usage(result.get('usageMetadata', {}))
         
         # JSON çıktısını çıkart ve ayrıştır
         json_text = result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text')
@@ -156,6 +357,10 @@ def process_file(input_file, output_file, cuisine_type):
     total_recipes = len(recipes)
     processed_count = 0
 
+    # Token istatistikleri dosya başına raporlanır
+    CACHE_STATE["prompt_tokens"] = 0
+    CACHE_STATE["cached_tokens"] = 0
+
     # 2. Her tarifi geçer ve güncelleyin
     for i, recipe in enumerate(recipes):
         recipe_name = recipe.get('name')
@@ -216,6 +421,8 @@ def process_file(input_file, output_file, cuisine_type):
     save_current_recipes(recipes, output_file) # Son toplu işi kaydetmek için son kayıt
     print(f"\n--- {input_file} dosya işleme tamamlandı ---")
     print(f"{processed_count} tarif güncellendi ve nihai dosya şuraya kaydedildi: {output_file}")
+    invalidate_prompt_cache() # Kullanılmayan önbellek kaynağını sunucuda bırakma
+    print(f"Bu dosya için toplam istem token sayısı: {CACHE_STATE['prompt_tokens']}, önbellekten okunan (indirimli ücretli): {CACHE_STATE['cached_tokens']}")
 
 
 def main():
@@ -223,9 +430,12 @@ def main():
         print("Hata: Gemini API anahtarı bulunamadı. Lütfen koda doğru anahtarı ekleyin.")
         return
 
-    for file_info in FILES_TO_PROCESS:
-        process_file(file_info["input"], file_info["output"], file_info["cuisine"])
-
+    try:
+        for file_info in FILES_TO_PROCESS:
+            process_file(file_info["input"], file_info["output"], file_info["cuisine"])
+    finally:
+        # Betik yarıda kesilse bile önbellek kaynağı sunucuda bırakılmaz
+        invalidate_prompt_cache()
     print("\n\n*** Tüm dosya işleme tamamlandı! ***")
 
 
@@ -0,0 +1,299 @@
+# mock_gemini_server.py - gemini_recipe_generator.py betiğinin bağlam önbelleği akışlarını gerçek API olmadan
+# denemek için 'generateContent', 'countTokens' ve 'cachedContents' uç noktalarını taklit eden yerel sahte (mock) sunucu
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ----------------------------------------------------
+# 1. Ayarlar
+# ----------------------------------------------------
+
+MOCK_HOST = "127.0.0.1"
+MOCK_PORT = 8765
+
+# Kullanım:
+#   python mock_gemini_server.py          -> Sunucuyu başlatır (GEMINI_API_BASE=http://127.0.0.1:8765/v1beta)
+#   python mock_gemini_server.py --check  -> Önbellek senaryolarını çalıştırır ve sonuçları raporlar
+
+
+# ----------------------------------------------------
+# 2. Sahte sunucu
+# ----------------------------------------------------
+
+class MockState:
+    """Sunucunun durumu ve senaryoların hata enjeksiyonu için kullandığı ayarlar."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.caches = {} # ad -> {"tokens": int, "expires_at": float}
+        self.next_id = 1
+        self.log = [] # (yöntem, yol, istek gövdesi) kayıtları
+        self.min_cache_tokens = 1024 # Gemini 2.5 Flash/Flash-Lite sınırı; altındaki içerik için 400 "too small" döner
+        self.create_failures = 0 # Önbellek oluşturma isteklerinden kaç tanesi 429 ile reddedilecek
+        self.patch_failures = 0 # Önbellek yenileme (PATCH) isteklerinden kaç tanesi 503 ile reddedilecek
+        self.generate_error = None # (durum, mesaj) ayarlanırsa her generateContent isteği bu hatayı döner
+
+    def count(self, method, suffix):
+        return sum(1 for m, path, _ in self.log if m == method and path.endswith(suffix))
+
+
+STATE = MockState()
+
+def estimate_tokens(text):
+    """Kaba token tahmini (yaklaşık 4 karakter = 1 token)."""
+    return max(1, len(text) // 4)
+
+def error_body(code, message, status):
+    return {"error": {"code": code, "message": message, "status": status}}
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+
+    def _send(self, code, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _path(self):
+        return self.path.split("?")[0]
+
+    def _cache_name(self):
+        # /v1beta/cachedContents/c1 -> cachedContents/c1
+        return "cachedContents/" + self._path().rsplit("/", 1)[-1]
+
+    def _live_cache(self, name):
+        cache = STATE.caches.get(name)
+        if cache and cache["expires_at"] <= time.time():
+            del STATE.caches[name]
+            return None
+        return cache
+
+    def do_POST(self):
+        body = self._read_body()
+        path = self._path()
+        STATE.log.append(("POST", path, body))
+
+        if path.endswith("/cachedContents"):
+            return self._create_cache(body)
+        if path.endswith(":generateContent"):
+            return self._generate_content(body)
+        if path.endswith(":countTokens"):
+            text = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+            return self._send(200, {"totalTokens": estimate_tokens(text)})
+        self._send(404, error_body(404, "Not found", "NOT_FOUND"))
+
+    def do_PATCH(self):
+        body = self._read_body()
+        STATE.log.append(("PATCH", self._path(), body))
+        if STATE.patch_failures > 0:
+            STATE.patch_failures -= 1
+            return self._send(503, error_body(503, "The service is currently unavailable.", "UNAVAILABLE"))
+        name = self._cache_name()
+        cache = self._live_cache(name)
+        if not cache:
+            return self._send(404, error_body(404, f"CachedContent not found: {name}", "NOT_FOUND"))
+        cache["expires_at"] = time.time() + int(body.get("ttl", "0s").rstrip("s"))
+        self._send(200, {"name": name})
+
+    def do_DELETE(self):
+        STATE.log.append(("DELETE", self._path(), None))
+        name = self._cache_name()
+        if STATE.caches.pop(name, None) is None:
+            return self._send(404, error_body(404, f"CachedContent not found: {name}", "NOT_FOUND"))
+        self._send(200, {})
+
+    def _create_cache(self, body):
+        if STATE.create_failures > 0:
+            STATE.create_failures -= 1
+            return self._send(429, error_body(429, "Resource has been exhausted", "RESOURCE_EXHAUSTED"))
+
+        text = body.get("systemInstruction", {}).get("parts", [{}])[0].get("text", "")
+        tokens = estimate_tokens(text)
+        if tokens < STATE.min_cache_tokens:
+            message = f"Cached content is too small. total_token_count={tokens}, min_total_token_count={STATE.min_cache_tokens}"
+            return self._send(400, error_body(400, message, "INVALID_ARGUMENT"))
+
+        name = f"cachedContents/c{STATE.next_id}"
+        STATE.next_id += 1
+        STATE.caches[name] = {"tokens": tokens, "expires_at": time.time() + int(body.get("ttl", "0s").rstrip("s"))}
+        self._send(200, {"name": name, "model": body.get("model"), "usageMetadata": {"totalTokenCount": tokens}})
+
+    def _generate_content(self, body):
+        if STATE.generate_error:
+            code, message = STATE.generate_error
+            return self._send(code, error_body(code, message, "INVALID_ARGUMENT"))
+
+        cached_tokens = 0
+        name = body.get("cachedContent")
+        if name:
+            cache = self._live_cache(name)
+            if not cache:
+                return self._send(403, error_body(403, "CachedContent not found (or permission denied)", "PERMISSION_DENIED"))
+            cached_tokens = cache["tokens"]
+
+        prompt_text = body["contents"][0]["parts"][0]["text"]
+        prompt_text += body.get("systemInstruction", {}).get("parts", [{}])[0].get("text", "")
+        result = {"ingredients": ["1 su bardağı şeker"], "instructions": ["Tüm malzemeleri karıştırın."]}
+        self._send(200, {
+            "candidates": [{"content": {"parts": [{"text": json.dumps(result, ensure_ascii=False)}]}}],
+            "usageMetadata": {
+                "promptTokenCount": estimate_tokens(prompt_text) + cached_tokens,
+                "cachedContentTokenCount": cached_tokens,
+            },
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ----------------------------------------------------
+# 3. Önbellek senaryoları
+# ----------------------------------------------------
+
+def run_checks():
+    """
+    Sunucuyu arka planda başlatır ve gemini_recipe_generator.py üzerinde önbellek oluşturma, yeniden kullanma,
+    yenileme (PATCH), silinen önbelleğin yeniden oluşturulması, geçici/kalıcı hatalar ve satır içi istem
+    senaryolarını çalıştırır. Tüm kontroller başarılıysa 0 ile çıkar.
+    """
+    server = ThreadingHTTPServer((MOCK_HOST, 0), MockGeminiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["GEMINI_API_BASE"] = f"http://{MOCK_HOST}:{server.server_address[1]}/v1beta"
+
+    import gemini_recipe_generator as generator
+
+    # Gerçek SYSTEM_PROMPT önbellek sınırının altındadır; önbellekli akışlar sınırı aşan uzun bir talimatla denenir.
+    short_prompt = generator.SYSTEM_PROMPT
+    long_prompt = short_prompt + "\n" + "\n".join(
+        f"Kural {i}: Malzeme miktarlarını standart Türk ölçü birimleriyle ve açık, numaralı adımlarla yaz." for i in range(60))
+
+    def reset(prompt=long_prompt):
+        STATE.reset()
+        generator.SYSTEM_PROMPT = prompt
+        generator.CACHE_STATE.update({"name": None, "expires_at": 0, "token_count": 0, "prefix_tokens": None,
+                                      "disabled": False, "cached_tokens": 0, "prompt_tokens": 0})
+
+    def generate():
+        return generator.generate_recipe_content("Baklava", "Turkish Dessert", 0)
+
+    def generate_payloads():
+        return [body for method, path, body in STATE.log if path.endswith(":generateContent")]
+
+    results = []
+
+    def check(title, condition):
+        results.append((title, bool(condition)))
+
+    # 1. Önbellek bir kez oluşturulur ve sonraki isteklerde yeniden kullanılır
+    reset()
+    ok = generate() and generate()
+    payloads = generate_payloads()
+    check("Önbellek oluşturma ve yeniden kullanma",
+          ok and STATE.count("POST", "/cachedContents") == 1
+          and all(p.get("cachedContent") == "cachedContents/c1" and "systemInstruction" not in p for p in payloads)
+          and generator.CACHE_STATE["cached_tokens"] > 0)
+
+    # 2. Süresi dolmak üzere olan önbellek PATCH ile uzatılır
+    generator.CACHE_STATE["expires_at"] = time.time() + generator.CACHE_RENEW_MARGIN / 2
+    ok = generate()
+    check("Süresi dolmadan önce yenileme (PATCH)",
+          ok and STATE.count("PATCH", "/cachedContents/c1") == 1 and generator.CACHE_STATE["name"] == "cachedContents/c1")
+
+    # 2b. Geçici PATCH hatasında (503) önbellek silinmez; yenileme sonraki istekte tekrar denenir
+    STATE.patch_failures = 1
+    generator.CACHE_STATE["expires_at"] = time.time() + generator.CACHE_RENEW_MARGIN / 2
+    ok = generate() and generate()
+    check("Geçici yenileme hatasında önbelleğin korunması",
+          ok and STATE.count("PATCH", "/cachedContents/c1") == 3 and STATE.count("DELETE", "/cachedContents/c1") == 0
+          and STATE.count("POST", "/cachedContents") == 1 and generator.CACHE_STATE["name"] == "cachedContents/c1"
+          and generator.CACHE_STATE["expires_at"] > time.time() + generator.CACHE_RENEW_MARGIN)
+
+    # 3. Sunucuda silinen (süresi dolan) önbellek yeniden oluşturulur, istek tekrar denenir
+    STATE.caches.clear()
+    ok = generate()
+    check("Silinen önbelleğin yeniden oluşturulması",
+          ok and generator.CACHE_STATE["name"] == "cachedContents/c2" and STATE.count("POST", "/cachedContents") == 2)
+
+    # 4. Önbellekle ilgisi olmayan 400 hatası yeni önbellek oluşturmaz
+    STATE.generate_error = (400, "Request contains an invalid argument.")
+    generate()
+    generate()
+    check("İlgisiz 400 hatasında önbellek korunur",
+          STATE.count("POST", "/cachedContents") == 2 and generator.CACHE_STATE["name"] == "cachedContents/c2")
+    STATE.generate_error = None
+
+    # 5. Çalışma sonunda önbellek kaynağı silinir
+    generator.invalidate_prompt_cache()
+    check("Çalışma sonunda önbelleğin silinmesi",
+          STATE.count("DELETE", "/cachedContents/c2") == 1 and not STATE.caches)
+
+    # 6. Geçici 429 hatasında istek satır içi istemle gönderilir, önbellek sonraki istekte yeniden denenir
+    reset()
+    STATE.create_failures = 1
+    ok = generate() and generate()
+    payloads = generate_payloads()
+    check("Geçici 429 sonrası önbelleğin yeniden denenmesi",
+          ok and not generator.CACHE_STATE["disabled"]
+          and "systemInstruction" in payloads[0] and payloads[1].get("cachedContent") == "cachedContents/c1")
+
+    # 7. Gerçek (kısa) talimat minimum token sınırının altında: önbellek isteği hiç gönderilmez,
+    #    istekler yalnızca kısa sistem talimatıyla satır içi gönderilir (şema yalnızca generationConfig'de)
+    reset(short_prompt)
+    ok = generate() and generate()
+    payloads = generate_payloads()
+    check("Kısa talimatta önbelleğin atlanması ve satır içi istem",
+          ok and generator.CACHE_STATE["disabled"] and STATE.count("POST", ":countTokens") == 1
+          and STATE.count("POST", "/cachedContents") == 0
+          and all(p.get("systemInstruction") == {"parts": [{"text": short_prompt}]}
+                  and p["generationConfig"]["responseSchema"] == generator.RESPONSE_SCHEMA for p in payloads))
+
+    # 8. countTokens yanıt vermezse sunucunun 'too small' hatası önbelleği yine kapatır
+    reset(short_prompt)
+    STATE.min_cache_tokens = 100000
+    generator.CACHE_STATE["prefix_tokens"] = None
+    count_tokens_url = generator.COUNT_TOKENS_URL
+    generator.COUNT_TOKENS_URL = count_tokens_url.replace(":countTokens", ":missing")
+    ok = generate() and generate()
+    check("countTokens olmadan minimum sınırda geri dönüş",
+          ok and generator.CACHE_STATE["disabled"] and STATE.count("POST", "/cachedContents") == 1)
+
+    generator.COUNT_TOKENS_URL = count_tokens_url
+    generator.SYSTEM_PROMPT = short_prompt
+
+    server.shutdown()
+
+    print("\n--- Önbellek senaryoları ---")
+    for title, passed in results:
+        print(f"[{'BAŞARILI' if passed else 'BAŞARISIZ'}] {title}")
+    return all(passed for _, passed in results)
+
+
+def main():
+    if "--check" in sys.argv:
+        sys.exit(0 if run_checks() else 1)
+
+    server = ThreadingHTTPServer((MOCK_HOST, MOCK_PORT), MockGeminiHandler)
+    print(f"--- Sahte Gemini sunucusu çalışıyor: http://{MOCK_HOST}:{MOCK_PORT}/v1beta ---")
+    print(f"Betiği bu sunucuya yönlendirmek için: GEMINI_API_BASE=http://{MOCK_HOST}:{MOCK_PORT}/v1beta")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nSunucu durduruldu.")
+
+
+if __name__ == "__main__":
+    main()